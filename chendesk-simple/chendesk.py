@@ -10,12 +10,17 @@ import socket
 import threading
 import struct
 import io
+import errno
 import os
 import sys
 import time
-import json
-import zlib
+import queue
+import select
+import selectors
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from tkinter import filedialog
 
 import customtkinter as ctk
 from PIL import Image, ImageTk
@@ -25,6 +30,12 @@ import cv2
 from pynput import mouse, keyboard
 from zeroconf import ServiceBrowser, ServiceInfo, Zeroconf
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGRA, TJPF_RGB, TJSAMP_420, TJFLAG_PROGRESSIVE
+except ImportError:
+    # Fallback to OpenCV JPEG codec if PyTurboJPEG not installed
+    TurboJPEG = None
+
 # ==================== CONFIG ====================
 APP_NAME = "ChenDesk"
 SERVICE_TYPE = "_chendesk._tcp.local."
@@ -33,8 +44,107 @@ CONTROL_PORT = 5901
 FILE_PORT = 5902
 DISCOVERY_PORT = 5903
 BUFFER_SIZE = 65536
-QUALITY = 50  # JPEG quality (1-100)
+FILE_CHUNK_SIZE = 1 << 20  # 1 MiB per disk read / socket op for file transfers
+FILE_PIPELINE_BUFFERS = 4  # Chunks in flight between disk reader and socket writer
+SOCKET_BUFFER_SIZE = 4 * 1024 * 1024  # SO_SNDBUF/SO_RCVBUF for screen + file sockets
+QUALITY = 50  # JPEG quality (1-100), upper limit for adaptive quality
+MIN_QUALITY = 20  # Adaptive quality never goes below this
+ENCODE_WORKERS = 2
 FPS = 30
+CONTROL_FLUSH_INTERVAL = 0.005  # Seconds to collect control events into one send
+
+# Control protocol: binary records, 1-byte opcode first
+CMD_MOUSE_MOVE = 1
+CMD_MOUSE_CLICK = 2
+CMD_MOUSE_SCROLL = 3
+CMD_KEY = 4
+MOUSE_MOVE = struct.Struct('!Bii')    # opcode, x, y
+MOUSE_CLICK = struct.Struct('!BBB')   # opcode, button, action
+MOUSE_SCROLL = struct.Struct('!Bbb')  # opcode, dx, dy
+KEY = struct.Struct('!BBB')           # opcode, action, key length (UTF-8 key follows)
+BUTTONS = {'left': 0, 'right': 1}
+ACTIONS = {'press': 0, 'release': 1}
+
+# os.sendfile errors meaning "not for this file/socket", not a broken connection
+SENDFILE_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP}
+
+
+def _load_turbojpeg():
+    """Load libjpeg-turbo codec, or None to use OpenCV instead"""
+    if TurboJPEG is None:
+        return None
+    try:
+        return TurboJPEG()
+    except Exception:
+        # PyTurboJPEG installed but libjpeg-turbo library not found
+        return None
+
+
+@lru_cache(maxsize=None)  # LAN IP rarely changes; cache_clear() after a network change
+def _get_local_ip():
+    """Get local IP address"""
+    # Host's own IPv4 addresses; answered locally on Windows and from hosts/myhostname
+    # on most Linux setups, otherwise NSS may fall through to a DNS query
+    try:
+        infos = socket.getaddrinfo(socket.gethostname(), None, socket.AF_INET)
+    except socket.gaierror:
+        infos = []
+    candidates = []
+    for info in infos:
+        ip = info[4][0]
+        if not ip.startswith(('127.', '169.254.')) and ip not in candidates:
+            candidates.append(ip)
+    if len(candidates) == 1:
+        return candidates[0]
+        
+    # Several adapters (VPN, Hyper-V, ...): let the routing table pick the LAN one
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect(('8.8.8.8', 80))
+        return s.getsockname()[0]
+    except OSError:
+        # No default route
+        return candidates[0] if candidates else '127.0.0.1'
+    finally:
+        s.close()
+
+
+def _tune_socket(sock, nodelay=False, buffer_size=None):
+    """Disable Nagle and/or enlarge kernel buffers (OS defaults can be 64 KB)"""
+    if nodelay:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if buffer_size:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, buffer_size)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_size)
+
+
+def _abort_socket(sock):
+    """Close at once: shutdown wakes threads blocked in recv/send/accept, close alone doesn't on Linux"""
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass  # Never connected or already reset
+    sock.close()
+
+
+def _send_frame(sock, header, data):
+    """Send header + payload in one syscall without joining them (like sendall)"""
+    if not hasattr(sock, 'sendmsg'):
+        # No sendmsg on Windows, two sendall calls still avoid the copy
+        sock.sendall(header)
+        sock.sendall(data)
+        return
+        
+    buffers = [memoryview(header), memoryview(data)]
+    while buffers:
+        sent = sock.sendmsg(buffers)
+        # Drop fully sent buffers, trim a partially sent one
+        while buffers and sent >= len(buffers[0]):
+            sent -= len(buffers[0])
+            buffers.pop(0)
+        if buffers:
+            buffers[0] = buffers[0][sent:]
+
 
 # ==================== NETWORK DISCOVERY ====================
 class LANDiscovery:
@@ -95,7 +205,7 @@ class ServiceAnnouncer:
         """Start announcing service"""
         self.zeroconf = Zeroconf()
         hostname = socket.gethostname()
-        local_ip = self._get_local_ip()
+        local_ip = _get_local_ip()
         
         self.info = ServiceInfo(
             SERVICE_TYPE,
@@ -112,15 +222,6 @@ class ServiceAnnouncer:
         if self.zeroconf and self.info:
             self.zeroconf.unregister_service(self.info)
             self.zeroconf.close()
-            
-    def _get_local_ip(self):
-        """Get local IP address"""
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        try:
-            s.connect(('8.8.8.8', 80))
-            return s.getsockname()[0]
-        finally:
-            s.close()
 
 
 # ==================== SCREEN CAPTURE & STREAMING ====================
@@ -129,8 +230,17 @@ class ScreenServer:
     
     def __init__(self):
         self.running = False
-        self.clients = []
+        self.clients = ()  # Immutable snapshot: writers swap it, readers need no lock
+        self._clients_lock = threading.Lock()  # Serializes writers only
         self.server_socket = None
+        self.jpeg = _load_turbojpeg()
+        self.encode_pool = None
+        self.frames = queue.Queue(maxsize=2)  # Encoded frames (futures) in capture order
+        self._scratch = threading.local()  # Per-encoder-thread buffers
+        self.quality = QUALITY  # Lowered automatically when encoding can't keep up
+        self._encode_time = 0.0  # Moving average of seconds per encode
+        self._next_adapt = 0.0  # Earliest time.monotonic() for the next quality step
+        self._force_frame = False  # Send next frame even if screen unchanged
         
     def start(self):
         """Start screen server"""
@@ -138,14 +248,20 @@ class ScreenServer:
         
         # Start server socket
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        _tune_socket(self.server_socket, buffer_size=SOCKET_BUFFER_SIZE)  # Inherited by accepted sockets
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.server_socket.bind(('0.0.0.0', SCREEN_PORT))
         self.server_socket.listen(5)
         
+        # JPEG encoders and sockets release the GIL, so encode in parallel
+        self.encode_pool = ThreadPoolExecutor(max_workers=ENCODE_WORKERS, thread_name_prefix="encode")
+        
         # Accept clients thread
         threading.Thread(target=self._accept_clients, daemon=True).start()
-        # Stream thread
+        # Capture thread
         threading.Thread(target=self._stream_screen, daemon=True).start()
+        # Send thread
+        threading.Thread(target=self._send_frames, daemon=True).start()
         
         print(f"🖥️ Screen server started on port {SCREEN_PORT}")
         
@@ -154,78 +270,201 @@ class ScreenServer:
         self.running = False
         for client in self.clients:
             try:
-                client.close()
+                _abort_socket(client)
             except:
                 pass
         if self.server_socket:
-            self.server_socket.close()
+            _abort_socket(self.server_socket)
+        if self.encode_pool:
+            self.encode_pool.shutdown(wait=False, cancel_futures=True)
             
     def _accept_clients(self):
         """Accept incoming client connections"""
         while self.running:
             try:
                 client, addr = self.server_socket.accept()
-                self.clients.append(client)
+                _tune_socket(client, nodelay=True, buffer_size=SOCKET_BUFFER_SIZE)
+                with self._clients_lock:
+                    self.clients = self.clients + (client,)
+                self._force_frame = True  # New client needs a frame even on a static screen
                 print(f"👤 Client connected: {addr}")
             except:
                 break
                 
     def _stream_screen(self):
-        """Capture and stream screen"""
+        """Capture screen and queue frames for encoding"""
         # Create mss instance inside the thread (required for Windows)
         with mss.mss() as sct:
             monitor = sct.monitors[1]  # Primary monitor
             
+            # Resize for bandwidth (adaptive), fixed for this monitor
+            scale = min(1.0, 1920 / monitor['width'])  # Max 1920px width
+            size = (int(monitor['width'] * scale), int(monitor['height'] * scale))
+            last_raw = None
+            last_quality = QUALITY  # Quality the last sent frame was encoded at
+            next_frame = time.monotonic()
+            
             while self.running:
                 try:
+                    # Pace by deadline: grab time doesn't stretch the frame interval
+                    next_frame += 1 / FPS
+                    delay = next_frame - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        next_frame = time.monotonic()  # Running late, don't burst to catch up
+                        
+                    # Nobody watching, or encoder/network behind: skip this frame
+                    if not self.clients or self.frames.full():
+                        continue
+                        
                     # Capture screen
                     img = sct.grab(monitor)
-                    frame = np.array(img)
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
                     
-                    # Resize for bandwidth (adaptive)
-                    h, w = frame.shape[:2]
-                    scale = min(1.0, 1920 / w)  # Max 1920px width
-                    if scale < 1.0:
-                        frame = cv2.resize(frame, None, fx=scale, fy=scale)
+                    # Screen unchanged since last frame: nothing to encode or send
+                    # (full memcmp, sampling rows would miss a blinking caret),
+                    # unless the viewer is still looking at a degraded frame
+                    if img.raw == last_raw and not self._force_frame:
+                        if last_quality >= QUALITY:
+                            continue
+                        quality = QUALITY  # One full-quality refresh of the static screen
+                    else:
+                        quality = self.quality
+                    last_raw = img.raw
+                    last_quality = quality
+                    self._force_frame = False
                     
-                    # Encode as JPEG
-                    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, QUALITY])
-                    data = zlib.compress(buffer.tobytes(), 1)
-                    
-                    # Send to all clients
-                    header = struct.pack('!II', len(data), int(scale * 100))
-                    dead_clients = []
-                    
-                    for client in self.clients:
-                        try:
-                            client.sendall(header + data)
-                        except:
-                            dead_clients.append(client)
-                            
-                    # Remove dead clients
-                    for client in dead_clients:
-                        self.clients.remove(client)
-                        
-                    time.sleep(1 / FPS)
+                    # Encode on the pool while we grab the next one; the queue
+                    # holds two frames in flight, like an A/B buffer pair
+                    self.frames.put(self.encode_pool.submit(self._encode_frame, img, scale, size, quality))
                     
                 except Exception as e:
                     if self.running:
                         print(f"Stream error: {e}")
                     time.sleep(0.1)
+                    
+    def _encode_frame(self, img, scale, size, quality):
+        """Resize and JPEG-encode a captured frame, returns (header, data, seconds)"""
+        start = time.perf_counter()
+        
+        # Zero-copy BGRA view; both encoders drop alpha inside their color
+        # conversion, so pixels are only read once on the way to JPEG
+        frame = np.asarray(img)
+        
+        # Only monitors wider than 1920px get resized; INTER_AREA is the
+        # fast path for shrinking and avoids aliasing on text
+        if scale < 1.0:
+            frame = cv2.resize(frame, size, dst=self._resize_buffer(size), interpolation=cv2.INTER_AREA)
+        
+        # Encode as JPEG (optimized Huffman tables = smaller frames)
+        if self.jpeg:
+            data = self.jpeg.encode(frame, quality=quality, pixel_format=TJPF_BGRA,
+                                    jpeg_subsample=TJSAMP_420, flags=TJFLAG_PROGRESSIVE)
+        else:
+            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality,
+                                                     cv2.IMWRITE_JPEG_OPTIMIZE, 1])
+            data = buffer.reshape(-1).data  # Send encoder output as-is, no copy
+            
+        header = struct.pack('!II', len(data), int(scale * 100))
+        return header, data, time.perf_counter() - start
+        
+    def _resize_buffer(self, size):
+        """Resize output reused across frames, one per encoder thread"""
+        buffer = getattr(self._scratch, 'resized', None)
+        if buffer is None or buffer.shape[:2] != (size[1], size[0]):
+            buffer = np.empty((size[1], size[0], 4), np.uint8)
+            self._scratch.resized = buffer
+        return buffer
+        
+    def _send_frames(self):
+        """Send encoded frames to all clients"""
+        while self.running:
+            try:
+                future = self.frames.get(timeout=0.5)
+            except queue.Empty:
+                # Static screen sends nothing, so sends can't reveal viewers that left
+                self._drop_clients(self._closed_clients())
+                continue
+                
+            try:
+                header, data, encode_time = future.result()
+            except Exception as e:
+                if self.running:
+                    print(f"Encode error: {e}")
+                continue
+                
+            self._adapt_quality(encode_time)
+            
+            # Send to all clients
+            dead_clients = []
+            
+            for client in self.clients:
+                try:
+                    _send_frame(client, header, data)
+                except:
+                    dead_clients.append(client)
+                    
+            self._drop_clients(dead_clients)
+            
+    def _closed_clients(self):
+        """Clients whose viewer hung up (viewers never send, so readable means EOF or reset)"""
+        clients = self.clients
+        if not clients:
+            return []
+        try:
+            readable, _, _ = select.select(clients, [], [], 0)
+        except OSError:
+            return []  # A socket closed under us, the next send finds it
+        closed = []
+        for client in readable:
+            try:
+                if not client.recv(1, socket.MSG_PEEK):
+                    closed.append(client)
+            except OSError:
+                closed.append(client)
+        return closed
+        
+    def _drop_clients(self, dead_clients):
+        """Remove and close dead clients"""
+        if dead_clients:
+            with self._clients_lock:
+                self.clients = tuple(c for c in self.clients if c not in dead_clients)
+            for client in dead_clients:
+                client.close()
+                
+    def _adapt_quality(self, encode_time):
+        """Trade JPEG quality for speed when encoding falls behind FPS"""
+        self._encode_time = 0.9 * self._encode_time + 0.1 * encode_time
+        budget = ENCODE_WORKERS / FPS  # Workers encode in parallel
+        
+        # One step per second, give the average time to follow
+        now = time.monotonic()
+        if now < self._next_adapt:
+            return
+        self._next_adapt = now + 1.0
+        
+        if self._encode_time > budget and self.quality > MIN_QUALITY:
+            self.quality = max(MIN_QUALITY, self.quality - 5)
+        elif self._encode_time < budget / 2 and self.quality < QUALITY:
+            self.quality = min(QUALITY, self.quality + 5)
 
 
 class ScreenClient:
     """Client that receives screen stream"""
     
     def __init__(self, on_frame=None):
-        self.on_frame = on_frame
+        self.on_frame = on_frame  # Called with RGB frames
         self.running = False
         self.socket = None
+        self.jpeg = _load_turbojpeg()
+        self.frame_size = None  # Remote frame size (w, h) before any decode scaling
+        self.target_size = None  # Display size (w, h), lets decoder shrink frames early
+        self._recv_buf = bytearray(4 * 1024 * 1024)  # Reused for every frame
         
     def connect(self, ip):
         """Connect to screen server"""
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        _tune_socket(self.socket, buffer_size=SOCKET_BUFFER_SIZE)
         self.socket.connect((ip, SCREEN_PORT))
         self.running = True
         threading.Thread(target=self._receive_stream, daemon=True).start()
@@ -235,7 +474,7 @@ class ScreenClient:
         """Disconnect from server"""
         self.running = False
         if self.socket:
-            self.socket.close()
+            _abort_socket(self.socket)
             
     def _receive_stream(self):
         """Receive and decode screen stream"""
@@ -252,10 +491,16 @@ class ScreenClient:
                 if not data:
                     break
                     
-                # Decompress and decode
-                buffer = zlib.decompress(data)
-                nparr = np.frombuffer(buffer, np.uint8)
-                frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+                # Decode straight to RGB for display
+                if self.jpeg:
+                    frame = self.jpeg.decode(data, pixel_format=TJPF_RGB,
+                                             scaling_factor=self._scaling_factor(data))
+                else:
+                    nparr = np.frombuffer(data, np.uint8)
+                    frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+                    if frame is not None:
+                        self.frame_size = (frame.shape[1], frame.shape[0])
+                        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 
                 if self.on_frame and frame is not None:
                     self.on_frame(frame)
@@ -264,26 +509,74 @@ class ScreenClient:
                 print(f"Receive error: {e}")
                 break
                 
+    def _scaling_factor(self, data):
+        """Pick the smallest IDCT scale that still covers the display size"""
+        width, height, _, _ = self.jpeg.decode_header(data)
+        self.frame_size = (width, height)
+        if not self.target_size:
+            return None
+        
+        fit = min(self.target_size[0] / width, self.target_size[1] / height)
+        if fit >= 1.0:
+            return None
+        
+        # (1, 1) is always supported, so there's at least one candidate
+        candidates = [f for f in self.jpeg.scaling_factors if fit <= f[0] / f[1] <= 1]
+        return min(candidates, key=lambda f: f[0] / f[1])
+        
     def _recv_exact(self, size):
-        """Receive exact number of bytes"""
-        data = b''
-        while len(data) < size:
-            chunk = self.socket.recv(min(size - len(data), BUFFER_SIZE))
-            if not chunk:
+        """Receive exact number of bytes (view into a reused buffer, valid until next call)"""
+        if size > len(self._recv_buf):
+            self._recv_buf = bytearray(size)
+        view = memoryview(self._recv_buf)[:size]
+        got = 0
+        while got < size:
+            n = self.socket.recv_into(view[got:], size - got)
+            if not n:
                 return None
-            data += chunk
-        return data
+            got += n
+        return view
 
 
 # ==================== REMOTE CONTROL ====================
+# Key names sent by ControlClient -> pynput keys (built once, used per keystroke)
+_SPECIAL_KEYS = {
+    'shift': keyboard.Key.shift,
+    'ctrl': keyboard.Key.ctrl,
+    'alt': keyboard.Key.alt,
+    'enter': keyboard.Key.enter,
+    'backspace': keyboard.Key.backspace,
+    'tab': keyboard.Key.tab,
+    'escape': keyboard.Key.esc,
+    'space': keyboard.Key.space,
+    'up': keyboard.Key.up,
+    'down': keyboard.Key.down,
+    'left': keyboard.Key.left,
+    'right': keyboard.Key.right,
+    'delete': keyboard.Key.delete,
+    'home': keyboard.Key.home,
+    'end': keyboard.Key.end,
+    'page_up': keyboard.Key.page_up,
+    'page_down': keyboard.Key.page_down,
+}
+_SPECIAL_KEYS.update({f'f{i}': getattr(keyboard.Key, f'f{i}') for i in range(1, 13)})  # F keys
+
+
 class ControlServer:
     """Server that receives and executes control commands"""
     
     def __init__(self):
         self.running = False
         self.server_socket = None
+        self.selector = None
         self.mouse_ctrl = mouse.Controller()
         self.keyboard_ctrl = keyboard.Controller()
+        self.commands = {
+            CMD_MOUSE_MOVE: (MOUSE_MOVE, self._mouse_move),
+            CMD_MOUSE_CLICK: (MOUSE_CLICK, self._mouse_click),
+            CMD_MOUSE_SCROLL: (MOUSE_SCROLL, self._mouse_scroll),
+            CMD_KEY: (KEY, self._key),
+        }
         
     def start(self):
         """Start control server"""
@@ -292,8 +585,12 @@ class ControlServer:
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.server_socket.bind(('0.0.0.0', CONTROL_PORT))
         self.server_socket.listen(5)
+        self.server_socket.setblocking(False)
         
-        threading.Thread(target=self._accept_clients, daemon=True).start()
+        # One thread multiplexes the listener and every client
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.server_socket, selectors.EVENT_READ, self._accept_client)
+        threading.Thread(target=self._serve, daemon=True).start()
         print(f"🎮 Control server started on port {CONTROL_PORT}")
         
     def stop(self):
@@ -302,83 +599,121 @@ class ControlServer:
         if self.server_socket:
             self.server_socket.close()
             
-    def _accept_clients(self):
-        """Accept control clients"""
+    def _serve(self):
+        """Dispatch socket events until stopped"""
         while self.running:
             try:
-                client, addr = self.server_socket.accept()
-                threading.Thread(target=self._handle_client, args=(client,), daemon=True).start()
-            except:
+                events = self.selector.select(timeout=0.5)
+            except OSError:
+                break  # Listener closed under select() on Windows
+            for key, _ in events:
+                key.data(key.fileobj)
+                
+        for key in list(self.selector.get_map().values()):
+            key.fileobj.close()
+        self.selector.close()
+        
+    def _accept_client(self, server_socket):
+        """Accept a control client"""
+        try:
+            client, addr = server_socket.accept()
+        except OSError:
+            return
+        _tune_socket(client, nodelay=True)
+        client.setblocking(False)
+        pending = bytearray()  # Bytes of a partially received record
+        self.selector.register(client, selectors.EVENT_READ,
+                               lambda sock: self._read_client(sock, pending))
+        
+    def _read_client(self, client, pending):
+        """Read from a client and run every complete command"""
+        try:
+            data = client.recv(BUFFER_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+            
+        try:
+            if not data:
+                raise ConnectionError
+            pending += data
+            del pending[:self._run_commands(pending)]
+        except Exception:
+            # Disconnected or garbage (unknown opcode, bad UTF-8)
+            self.selector.unregister(client)
+            client.close()
+            
+    def _run_commands(self, buffer):
+        """Execute all complete records in buffer, returns bytes consumed"""
+        pos = 0
+        while pos < len(buffer):
+            record, handler = self.commands[buffer[pos]]
+            end = pos + record.size
+            if end > len(buffer):
                 break
                 
-    def _handle_client(self, client):
-        """Handle control commands from client"""
-        while self.running:
-            try:
-                data = client.recv(BUFFER_SIZE)
-                if not data:
+            args = record.unpack_from(buffer, pos)[1:]
+            if record is KEY:
+                # Key name follows the fixed part
+                action, length = args
+                if end + length > len(buffer):
                     break
-                    
-                cmd = json.loads(data.decode())
-                self._execute_command(cmd)
+                args = (buffer[end:end + length].decode(), action)
+                end += length
                 
-            except:
-                break
-        client.close()
+            self._execute_command(handler, args)
+            pos = end
+        return pos
         
-    def _execute_command(self, cmd):
+    def _execute_command(self, handler, args):
         """Execute a control command"""
         try:
-            if cmd['type'] == 'mouse_move':
-                self.mouse_ctrl.position = (cmd['x'], cmd['y'])
-                
-            elif cmd['type'] == 'mouse_click':
-                btn = mouse.Button.left if cmd['button'] == 'left' else mouse.Button.right
-                if cmd['action'] == 'press':
-                    self.mouse_ctrl.press(btn)
-                else:
-                    self.mouse_ctrl.release(btn)
-                    
-            elif cmd['type'] == 'mouse_scroll':
-                self.mouse_ctrl.scroll(cmd['dx'], cmd['dy'])
-                
-            elif cmd['type'] == 'key':
-                key = self._parse_key(cmd['key'])
-                if cmd['action'] == 'press':
-                    self.keyboard_ctrl.press(key)
-                else:
-                    self.keyboard_ctrl.release(key)
-                    
+            handler(*args)
         except Exception as e:
             print(f"Control error: {e}")
             
-    def _parse_key(self, key_str):
-        """Parse key string to pynput key"""
-        special_keys = {
-            'shift': keyboard.Key.shift,
-            'ctrl': keyboard.Key.ctrl,
-            'alt': keyboard.Key.alt,
-            'enter': keyboard.Key.enter,
-            'backspace': keyboard.Key.backspace,
-            'tab': keyboard.Key.tab,
-            'escape': keyboard.Key.esc,
-            'space': keyboard.Key.space,
-            'up': keyboard.Key.up,
-            'down': keyboard.Key.down,
-            'left': keyboard.Key.left,
-            'right': keyboard.Key.right,
-            'delete': keyboard.Key.delete,
-            'home': keyboard.Key.home,
-            'end': keyboard.Key.end,
-            'page_up': keyboard.Key.page_up,
-            'page_down': keyboard.Key.page_down,
-        }
+    def _mouse_move(self, x, y):
+        """Move mouse to (x, y)"""
+        self.mouse_ctrl.position = (x, y)
+        
+    def _mouse_click(self, button, action):
+        """Press or release a mouse button"""
+        btn = mouse.Button.left if button == BUTTONS['left'] else mouse.Button.right
+        if action == ACTIONS['press']:
+            self.mouse_ctrl.press(btn)
+        else:
+            self.mouse_ctrl.release(btn)
+            
+    def _mouse_scroll(self, dx, dy):
+        """Scroll mouse wheel"""
+        self.mouse_ctrl.scroll(dx, dy)
         
-        # F keys
-        for i in range(1, 13):
-            special_keys[f'f{i}'] = getattr(keyboard.Key, f'f{i}')
+    def _key(self, key_str, action):
+        """Press or release a key"""
+        key = self._parse_key(key_str)
+        if action == ACTIONS['press']:
+            self.keyboard_ctrl.press(key)
+        else:
+            self.keyboard_ctrl.release(key)
             
-        return special_keys.get(key_str.lower(), key_str)
+    def _parse_key(self, key_str):
+        """Parse key string to pynput key"""
+        return _SPECIAL_KEYS.get(key_str.lower(), key_str)
+
+
+# Clicks have only 4 possible records, build them once
+_CLICK_RECORDS = {
+    (button, action): MOUSE_CLICK.pack(CMD_MOUSE_CLICK, BUTTONS[button], ACTIONS[action])
+    for button in BUTTONS for action in ACTIONS
+}
+
+
+@lru_cache(maxsize=512)
+def _key_record(key, action):
+    """Packed key command, cached since the same keys repeat constantly"""
+    key = key.encode()
+    return KEY.pack(CMD_KEY, ACTIONS[action], len(key)) + key
 
 
 class ControlClient:
@@ -388,52 +723,81 @@ class ControlClient:
         self.socket = None
         self.connected = False
         self.scale = 1.0  # Screen scale factor
+        self._pending = []  # Commands waiting for the next flush
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
         
     def connect(self, ip):
         """Connect to control server"""
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        _tune_socket(self.socket, nodelay=True)
         self.socket.connect((ip, CONTROL_PORT))
         self.connected = True
+        threading.Thread(target=self._flush_loop, daemon=True).start()
         print(f"🎮 Connected to control server at {ip}")
         
     def disconnect(self):
         """Disconnect from server"""
         self.connected = False
+        self._wakeup.set()
         if self.socket:
-            self.socket.close()
+            _abort_socket(self.socket)
             
     def send_mouse_move(self, x, y):
         """Send mouse move command"""
         if self.connected:
-            self._send({'type': 'mouse_move', 'x': int(x / self.scale), 'y': int(y / self.scale)})
+            self._enqueue(MOUSE_MOVE.pack(CMD_MOUSE_MOVE, int(x / self.scale), int(y / self.scale)))
             
     def send_mouse_click(self, button, action):
         """Send mouse click command"""
         if self.connected:
-            self._send({'type': 'mouse_click', 'button': button, 'action': action})
+            self._enqueue(_CLICK_RECORDS[button, action])
             
     def send_mouse_scroll(self, dx, dy):
         """Send mouse scroll command"""
         if self.connected:
-            self._send({'type': 'mouse_scroll', 'dx': dx, 'dy': dy})
+            self._enqueue(MOUSE_SCROLL.pack(CMD_MOUSE_SCROLL, dx, dy))
             
     def send_key(self, key, action):
         """Send key command"""
         if self.connected:
-            self._send({'type': 'key', 'key': key, 'action': action})
+            self._enqueue(_key_record(key, action))
             
-    def _send(self, cmd):
-        """Send command to server"""
-        try:
-            self.socket.sendall(json.dumps(cmd).encode())
-        except:
-            self.connected = False
+    def _enqueue(self, cmd):
+        """Queue packed command for the flush thread"""
+        with self._lock:
+            # Consecutive moves: only the latest position matters
+            if (cmd[0] == CMD_MOUSE_MOVE and self._pending
+                    and self._pending[-1][0] == CMD_MOUSE_MOVE):
+                self._pending[-1] = cmd
+            else:
+                self._pending.append(cmd)
+        self._wakeup.set()
+        
+    def _flush_loop(self):
+        """Send queued commands, rapid events go out in one send"""
+        while self.connected:
+            self._wakeup.wait()
+            time.sleep(CONTROL_FLUSH_INTERVAL)  # Let rapid events pile up
+            self._wakeup.clear()
+            
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch or not self.connected:
+                continue
+                
+            try:
+                self.socket.sendall(b''.join(batch))
+            except:
+                self.connected = False
 
 
 # ==================== FILE TRANSFER ====================
 class FileServer:
     """Server that receives files"""
     
+    CHUNK_SIZE = FILE_CHUNK_SIZE  # Bytes per recv_into
+    
     def __init__(self, save_dir=None):
         self.save_dir = save_dir or str(Path.home() / "Desktop" / "ChenDesk_Files")
         self.running = False
@@ -444,6 +808,7 @@ class FileServer:
         """Start file server"""
         self.running = True
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        _tune_socket(self.server_socket, buffer_size=SOCKET_BUFFER_SIZE)  # Inherited by accepted sockets
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.server_socket.bind(('0.0.0.0', FILE_PORT))
         self.server_socket.listen(5)
@@ -455,82 +820,212 @@ class FileServer:
         """Stop file server"""
         self.running = False
         if self.server_socket:
-            self.server_socket.close()
+            _abort_socket(self.server_socket)
             
     def _accept_files(self):
         """Accept file transfers"""
         while self.running:
             try:
                 client, addr = self.server_socket.accept()
+                _tune_socket(client, buffer_size=SOCKET_BUFFER_SIZE)
                 threading.Thread(target=self._receive_file, args=(client,), daemon=True).start()
             except:
                 break
                 
     def _receive_file(self, client):
-        """Receive a file from client"""
+        """Receive files from client until the end-of-batch header"""
+        # One scratch buffer for headers, filenames and data of this connection
+        buffer = bytearray(self.CHUNK_SIZE)
+        view = memoryview(buffer)
         try:
-            # Receive header (filename length + file size)
-            header = client.recv(8)
-            name_len, file_size = struct.unpack('!II', header)
-            
-            # Receive filename
-            filename = client.recv(name_len).decode()
-            
-            # Receive file data
-            filepath = os.path.join(self.save_dir, filename)
-            received = 0
-            
-            with open(filepath, 'wb') as f:
-                while received < file_size:
-                    chunk = client.recv(min(BUFFER_SIZE, file_size - received))
-                    if not chunk:
-                        break
-                    f.write(chunk)
-                    received += len(chunk)
+            while True:
+                # Receive header (filename length + file size), name length 0 ends the batch
+                name_len, file_size = struct.unpack('!II', self._recv_exact(client, view, 8))
+                if not name_len:
+                    break
                     
-            print(f"📥 Received file: {filename} ({file_size} bytes)")
+                # Receive filename
+                filename = bytes(self._recv_exact(client, view, name_len)).decode()
+                
+                # Receive file data
+                filepath = os.path.join(self.save_dir, filename)
+                received = 0
+                
+                with open(filepath, 'wb') as f:
+                    while received < file_size:
+                        n = client.recv_into(view, min(len(buffer), file_size - received))
+                        if not n:
+                            raise ConnectionError(f"Connection closed during {filename}")
+                        f.write(view[:n])
+                        received += n
+                        
+                print(f"📥 Received file: {filename} ({file_size} bytes)")
             
         except Exception as e:
             print(f"File receive error: {e}")
         finally:
             client.close()
+            
+    def _recv_exact(self, client, view, size):
+        """Receive exactly size bytes into the start of view"""
+        if size > len(view):
+            raise ValueError(f"Field too large: {size} bytes")
+        got = 0
+        while got < size:
+            n = client.recv_into(view[got:size])
+            if not n:
+                raise ConnectionError("Connection closed mid-header")
+            got += n
+        return view[:size]
 
 
 class FileClient:
     """Client that sends files"""
     
-    def send_file(self, ip, filepath):
-        """Send a file to server"""
+    CHUNK_SIZE = FILE_CHUNK_SIZE  # Bytes per disk read / sendall
+    PROGRESS_STEP = 8 * FILE_CHUNK_SIZE  # Bytes per sendfile call between progress reports
+    
+    def send_files(self, ip, filepaths, on_progress=None):
+        """Send files back-to-back over one connection, on_progress(sent, total) covers the whole batch"""
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.connect((ip, FILE_PORT))
-            
-            filename = os.path.basename(filepath)
-            file_size = os.path.getsize(filepath)
-            
-            # Send header
-            header = struct.pack('!II', len(filename.encode()), file_size)
-            sock.sendall(header)
-            sock.sendall(filename.encode())
-            
-            # Send file data
-            with open(filepath, 'rb') as f:
-                while True:
-                    chunk = f.read(BUFFER_SIZE)
-                    if not chunk:
-                        break
-                    sock.sendall(chunk)
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                _tune_socket(sock, nodelay=True, buffer_size=SOCKET_BUFFER_SIZE)
+                sock.connect((ip, FILE_PORT))
+                
+                total = sum(self._file_size(p) for p in filepaths)
+                done = 0
+                ok = True
+                report = on_progress or (lambda sent, total: None)
+                
+                for filepath in filepaths:
+                    filename = os.path.basename(filepath)
                     
-            print(f"📤 Sent file: {filename} ({file_size} bytes)")
-            sock.close()
-            return True
-            
+                    # Open before the header goes out so a bad path (missing, folder) only skips itself
+                    try:
+                        f = open(filepath, 'rb', buffering=0)  # Reads are already CHUNK_SIZE, skip the 8 KB layer
+                    except OSError as e:
+                        print(f"File send skipped {filename}: {e}")
+                        ok = False
+                        continue
+                        
+                    with f:
+                        file_size = os.fstat(f.fileno()).st_size
+                        
+                        # Send header + filename in one write
+                        name = filename.encode()
+                        sock.sendall(struct.pack('!II', len(name), file_size) + name)
+                        
+                        # Send exactly file_size bytes, the server reads the next header right after
+                        on_file_progress = lambda sent, size, done=done: report(done + sent, total)
+                        if not self._try_sendfile(sock, f, file_size, on_file_progress):
+                            self._send_pipelined(sock, f, file_size, on_file_progress)
+                            
+                    done += file_size
+                    print(f"📤 Sent file: {filename} ({file_size} bytes)")
+                    
+                # Empty header tells the server the batch is over
+                sock.sendall(struct.pack('!II', 0, 0))
+                return ok
+                
         except Exception as e:
             print(f"File send error: {e}")
             return False
+            
+    def _file_size(self, filepath):
+        """Size for the progress total, 0 for paths that will be skipped"""
+        try:
+            return os.path.getsize(filepath) if os.path.isfile(filepath) else 0
+        except OSError:
+            return 0
+            
+    def _try_sendfile(self, sock, f, file_size, on_progress):
+        """Kernel zero-copy send, False if unavailable (Windows, or file/socket type unsupported)"""
+        if not hasattr(os, 'sendfile'):
+            return False
+        # os.sendfile directly: socket.sendfile would fall back to its own 8 KB send loop
+        sent = 0
+        while sent < file_size:
+            try:
+                n = os.sendfile(sock.fileno(), f.fileno(), sent, min(self.PROGRESS_STEP, file_size - sent))
+            except OSError as e:
+                if sent or e.errno not in SENDFILE_UNSUPPORTED:
+                    raise  # Socket failure: the connection is gone, don't retry on it
+                print(f"sendfile unavailable ({e}), using chunked send")
+                f.seek(0)  # Fallback sends from the file position
+                return False
+            if not n:
+                raise EOFError(f"File shrank while sending ({sent}/{file_size} bytes)")
+            sent += n
+            on_progress(sent, file_size)
+        return True
+        
+    def _send_pipelined(self, sock, f, file_size, on_progress):
+        """Send file while a reader thread fetches the next chunks from disk"""
+        free = queue.Queue()  # Empty buffers for the reader
+        filled = queue.Queue()  # (buffer, nbytes) for the sender, None = done
+        errors = []
+        for _ in range(FILE_PIPELINE_BUFFERS):
+            free.put(bytearray(self.CHUNK_SIZE))
+            
+        def read_chunks():
+            try:
+                remaining = file_size - f.tell()  # Never read past the size in the header
+                while remaining > 0:
+                    buffer = free.get()
+                    if buffer is None:  # Sender gave up
+                        break
+                    n = f.readinto(memoryview(buffer)[:min(len(buffer), remaining)])
+                    if not n:
+                        break
+                    filled.put((buffer, n))
+                    remaining -= n
+            except Exception as e:
+                errors.append(e)
+            finally:
+                filled.put(None)
+                
+        sent = f.tell()  # Start position, read before the reader moves it
+        reader = threading.Thread(target=read_chunks, daemon=True)
+        reader.start()
+        try:
+            while True:
+                item = filled.get()
+                if item is None:
+                    break
+                buffer, n = item
+                sock.sendall(memoryview(buffer)[:n])
+                free.put(buffer)
+                sent += n
+                on_progress(sent, file_size)
+        finally:
+            free.put(None)  # Unblock the reader if sending failed
+            reader.join()
+            
+        if errors:
+            raise errors[0]
+        if sent < file_size:
+            raise EOFError(f"File shrank while sending ({sent}/{file_size} bytes)")
 
 
 # ==================== GUI APPLICATION ====================
+# Tk keysyms -> key names understood by ControlServer
+_TK_KEYSYM_MAP = {
+    'Shift_L': 'shift', 'Shift_R': 'shift',
+    'Control_L': 'ctrl', 'Control_R': 'ctrl',
+    'Alt_L': 'alt', 'Alt_R': 'alt',
+    'Return': 'enter',
+    'BackSpace': 'backspace',
+    'Tab': 'tab',
+    'Escape': 'escape',
+    'space': 'space',
+    'Up': 'up', 'Down': 'down', 'Left': 'left', 'Right': 'right',
+    'Delete': 'delete',
+    'Home': 'home', 'End': 'end',
+    'Prior': 'page_up', 'Next': 'page_down',
+}
+_TK_KEYSYM_MAP.update({f'F{i}': f'f{i}' for i in range(1, 13)})  # F keys
+
+
 class ChenDeskApp(ctk.CTk):
     """Main ChenDesk Application"""
     
@@ -546,6 +1041,15 @@ class ChenDeskApp(ctk.CTk):
         # State
         self.connected = False
         self.current_peer = None
+        self._photo = None  # Reused for every frame, recreated when size changes
+        self._frame_pending = False  # A frame is waiting for the main thread
+        self._resized = None  # Reused resize output, untouched while a frame is pending
+        self._closing = False
+        self._banner_shown = False
+        self.progress_q = queue.Queue()  # (sent, total) from file send worker
+        self.send_jobs = queue.Queue()  # (ip, filepaths) for the file send worker
+        self._sends_pending = 0  # Queued + running send jobs (main thread only)
+        self._sends_ok = True  # No job failed since the UI went busy
         
         # Services
         self.announcer = ServiceAnnouncer()
@@ -568,6 +1072,10 @@ class ChenDeskApp(ctk.CTk):
         # Start services
         self._start_services()
         
+        # Banner once the window is on screen, console output is slow on Windows
+        if not os.environ.get("CHENDESK_QUIET"):
+            self.bind('<Map>', self._on_first_map, add='+')
+            
         # Cleanup on close
         self.protocol("WM_DELETE_WINDOW", self._on_close)
         
@@ -587,7 +1095,7 @@ class ChenDeskApp(ctk.CTk):
         title_label.pack(pady=15)
         
         # My info
-        my_ip = self._get_local_ip()
+        my_ip = _get_local_ip()
         my_hostname = socket.gethostname()
         my_info = ctk.CTkLabel(left_frame, text=f"📍 คุณ: {my_hostname}\n    IP: {my_ip}", 
                                font=("Segoe UI", 12), text_color="gray")
@@ -661,9 +1169,16 @@ class ChenDeskApp(ctk.CTk):
         """Handle file drop"""
         if self.connected and self.current_peer:
             files = self.tk.splitlist(event.data)
-            for f in files:
-                self.file_client.send_file(self.current_peer[0], f)
+            self._start_file_send(files)
                 
+    def _on_first_map(self, event):
+        """Print banner when the main window first appears"""
+        # <Map> on the root also fires for every child widget
+        if event.widget is not self or self._banner_shown:
+            return
+        self._banner_shown = True
+        print(BANNER)
+        
     def _start_services(self):
         """Start all background services"""
         self.announcer.start()
@@ -671,14 +1186,17 @@ class ChenDeskApp(ctk.CTk):
         self.screen_server.start()
         self.control_server.start()
         self.file_server.start()
+        threading.Thread(target=self._send_files_worker, daemon=True).start()
         
     def _stop_services(self):
         """Stop all background services"""
-        self.announcer.stop()
-        self.discovery.stop()
-        self.screen_server.stop()
-        self.control_server.stop()
-        self.file_server.stop()
+        # Sockets first (instant), Zeroconf last (unregister sends goodbye packets)
+        for service in (self.screen_server, self.control_server, self.file_server,
+                        self.discovery, self.announcer):
+            try:
+                service.stop()
+            except Exception as e:
+                print(f"Stop error: {e}")  # Don't let one service block the rest
         
     def _on_peer_found(self, name, ip, hostname):
         """Called when a peer is found"""
@@ -708,15 +1226,10 @@ class ChenDeskApp(ctk.CTk):
             self._add_peer_button(name, ip, hostname)
             
     def _refresh_peers(self):
-        """Refresh peer discovery"""
-        self.discovery.stop()
-        for widget in self.peers_frame.winfo_children():
-            widget.destroy()
-        self.discovery = LANDiscovery(
-            on_found=self._on_peer_found,
-            on_removed=self._on_peer_removed
-        )
-        self.discovery.start()
+        """Refresh peer list from the running browser's cache"""
+        # The browser keeps listening for mDNS changes on its own; restarting
+        # Zeroconf would only rebind sockets and throw away its cache
+        self._refresh_peer_list()
         
     def _connect_to_peer(self, ip, hostname):
         """Connect to a remote peer"""
@@ -735,7 +1248,7 @@ class ChenDeskApp(ctk.CTk):
             # Update UI
             self.status_label.configure(text=f"✅ เชื่อมต่อกับ {hostname} ({ip})")
             self.disconnect_btn.configure(state="normal")
-            self.file_btn.configure(state="normal")
+            self.file_btn.configure(state="disabled" if self._sends_pending else "normal")
             
         except Exception as e:
             self.status_label.configure(text=f"❌ เชื่อมต่อไม่ได้: {e}")
@@ -754,41 +1267,67 @@ class ChenDeskApp(ctk.CTk):
         self.disconnect_btn.configure(state="disabled")
         self.file_btn.configure(state="disabled")
         self.screen_label.configure(image=None)
+        self._photo = None
         
     def _on_frame_received(self, frame):
         """Handle received frame"""
-        try:
-            # Convert BGR to RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # UI still busy with the previous frame: drop this one instead of queueing
+        if self._frame_pending:
+            return
             
+        try:
             # Get display size
             display_w = self.screen_frame.winfo_width()
             display_h = self.screen_frame.winfo_height()
             
             if display_w > 1 and display_h > 1:
-                # Calculate scale to fit
-                h, w = frame_rgb.shape[:2]
+                # Let the decoder shrink upcoming frames to about display size
+                self.screen_client.target_size = (display_w, display_h)
+                
+                # Calculate scale to fit (from remote frame size, not decoded size)
+                w, h = self.screen_client.frame_size
                 scale = min(display_w / w, display_h / h)
                 new_w = int(w * scale)
                 new_h = int(h * scale)
                 
-                # Resize
-                frame_resized = cv2.resize(frame_rgb, (new_w, new_h))
+                # Resize whatever the decoder's scaling didn't cover
+                if (frame.shape[1], frame.shape[0]) == (new_w, new_h):
+                    frame_resized = frame
+                else:
+                    if self._resized is None or self._resized.shape[:2] != (new_h, new_w):
+                        self._resized = np.empty((new_h, new_w, 3), np.uint8)
+                    interp = cv2.INTER_AREA if new_w < frame.shape[1] else cv2.INTER_LINEAR
+                    frame_resized = cv2.resize(frame, (new_w, new_h), dst=self._resized,
+                                               interpolation=interp)
                 
                 # Update control client scale
                 if self.control_client:
                     self.control_client.scale = scale
                 
-                # Convert to PIL Image
-                img = Image.fromarray(frame_resized)
-                photo = ctk.CTkImage(light_image=img, dark_image=img, size=(new_w, new_h))
-                
                 # Update UI (must be in main thread)
-                self.after(0, lambda: self.screen_label.configure(image=photo))
-                self.screen_label._photo = photo  # Keep reference
+                self._frame_pending = True
+                self.after(0, lambda: self._show_frame(frame_resized))
+                
+        except Exception as e:
+            self._frame_pending = False
+            
+    def _show_frame(self, frame):
+        """Paste RGB frame into the screen label's PhotoImage"""
+        try:
+            if not self.connected:
+                return
                 
+            img = Image.fromarray(frame)
+            if self._photo and (self._photo.width(), self._photo.height()) == img.size:
+                # Same size: update pixels in place, no new Tk image
+                self._photo.paste(img)
+            else:
+                self._photo = ImageTk.PhotoImage(img)
+                self.screen_label.configure(image=self._photo)
         except Exception as e:
             pass
+        finally:
+            self._frame_pending = False
             
     def _on_mouse_move(self, event):
         """Handle mouse move"""
@@ -822,62 +1361,103 @@ class ChenDeskApp(ctk.CTk):
                 
     def _tk_key_to_str(self, event):
         """Convert tkinter key event to string"""
-        special = {
-            'Shift_L': 'shift', 'Shift_R': 'shift',
-            'Control_L': 'ctrl', 'Control_R': 'ctrl',
-            'Alt_L': 'alt', 'Alt_R': 'alt',
-            'Return': 'enter',
-            'BackSpace': 'backspace',
-            'Tab': 'tab',
-            'Escape': 'escape',
-            'space': 'space',
-            'Up': 'up', 'Down': 'down', 'Left': 'left', 'Right': 'right',
-            'Delete': 'delete',
-            'Home': 'home', 'End': 'end',
-            'Prior': 'page_up', 'Next': 'page_down',
-        }
-        
-        # F keys
-        for i in range(1, 13):
-            special[f'F{i}'] = f'f{i}'
-            
         keysym = event.keysym
-        if keysym in special:
-            return special[keysym]
+        if keysym in _TK_KEYSYM_MAP:
+            return _TK_KEYSYM_MAP[keysym]
         elif len(event.char) == 1:
             return event.char
         return None
         
     def _send_file(self):
-        """Open file dialog and send file"""
+        """Open file dialog and send the chosen files"""
         if self.connected and self.current_peer:
-            from tkinter import filedialog
-            filepath = filedialog.askopenfilename(title="เลือกไฟล์ที่จะส่ง")
-            if filepath:
-                if self.file_client.send_file(self.current_peer[0], filepath):
-                    self.status_label.configure(text=f"✅ ส่งไฟล์สำเร็จ!")
-                else:
-                    self.status_label.configure(text=f"❌ ส่งไฟล์ไม่สำเร็จ")
-                    
-    def _get_local_ip(self):
-        """Get local IP address"""
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        try:
-            s.connect(('8.8.8.8', 80))
-            return s.getsockname()[0]
-        finally:
-            s.close()
+            filepaths = filedialog.askopenfilenames(title="เลือกไฟล์ที่จะส่ง")
+            if filepaths:
+                self._start_file_send(filepaths)
+                
+    def _start_file_send(self, filepaths):
+        """Send files on a worker thread so the UI doesn't freeze"""
+        # Drops still arrive while the button is disabled; they queue behind the running send
+        self._sends_pending += 1
+        if self._sends_pending == 1:
+            self._sends_ok = True
+            self.file_btn.configure(state="disabled")
+            self.status_label.configure(text="📤 กำลังส่งไฟล์...")
+            self.after(100, self._drain_progress)
+        self.send_jobs.put((self.current_peer[0], filepaths))
+        
+    def _send_files_worker(self):
+        """Run queued file sends one by one (single long-lived worker thread)"""
+        while True:
+            ip, filepaths = self.send_jobs.get()
+            ok = self.file_client.send_files(ip, filepaths, on_progress=self._post_progress)
+            self.after(0, lambda ok=ok: self._on_files_sent(ok))
+        
+    def _post_progress(self, sent, total):
+        """Queue send progress for the main thread (worker thread)"""
+        self.progress_q.put((sent, total))
+        
+    def _drain_progress(self):
+        """Show latest send progress, reschedules itself until all sends are done"""
+        latest = None
+        while True:
+            try:
+                latest = self.progress_q.get_nowait()
+            except queue.Empty:
+                break
+                
+        if not self._sends_pending:
+            return  # Done, _on_files_sent shows the result
+            
+        if latest:
+            sent, total = latest
+            self.status_label.configure(text=f"📤 กำลังส่งไฟล์... {sent * 100 // max(total, 1)}%")
+        self.after(100, self._drain_progress)
+        
+    def _on_files_sent(self, ok):
+        """Show send result and allow the next send once no job is left"""
+        self._sends_pending -= 1
+        self._sends_ok = self._sends_ok and ok
+        if self._sends_pending:
+            return
+            
+        if self._sends_ok:
+            self.status_label.configure(text=f"✅ ส่งไฟล์สำเร็จ!")
+        else:
+            self.status_label.configure(text=f"❌ ส่งไฟล์ไม่สำเร็จ")
+        if self.connected:
+            self.file_btn.configure(state="normal")
             
     def _on_close(self):
         """Handle window close"""
-        self._disconnect()
+        # Hide right away, shut down off the Tk thread so the window never hangs
+        self.withdraw()
+        threading.Thread(target=self._shutdown_then_destroy, daemon=True).start()
+        self.after(500, self._destroy_once)  # Give up waiting on a stuck service
+        
+    def _shutdown_then_destroy(self):
+        """Disconnect and stop services (worker thread), then close the app"""
+        for client in (self.screen_client, self.control_client):
+            if client:
+                try:
+                    client.disconnect()
+                except:
+                    pass
         self._stop_services()
-        self.destroy()
+        try:
+            self.after(0, self._destroy_once)
+        except:
+            pass  # Timeout already destroyed the window
+            
+    def _destroy_once(self):
+        """Destroy window (called by whichever of shutdown/timeout is first)"""
+        if not self._closing:
+            self._closing = True
+            self.destroy()
 
 
 # ==================== MAIN ====================
-if __name__ == "__main__":
-    print(f"""
+BANNER = """
 ╔═══════════════════════════════════════════════════╗
 ║         🖥️  ChenDesk Simple Remote Desktop         ║
 ║         ───────────────────────────────            ║
@@ -885,7 +1465,8 @@ if __name__ == "__main__":
 ║  • ไม่ต้องใส่ password                              ║
 ║  • ลากวางไฟล์ได้                                    ║
 ╚═══════════════════════════════════════════════════╝
-    """)
-    
+"""
+
+if __name__ == "__main__":
     app = ChenDeskApp()
     app.mainloop()